@@ -2,13 +2,8 @@ import argparse
 import os
 from pathlib import Path
 
-from open_table_format.iceber_ops import (
-    reset_demo_state,
-    gen_parquet_ns,
-    edit_local_ns_file,
-    upload_local_to_s3,
-    s3_object_exists,
-)
+# iceber_ops pulls in pandas/pyarrow/pyiceberg; each command imports only what it
+# needs so `--help` and argument errors return without paying that import cost.
 
 
 def _paths(datapath: str):
@@ -32,6 +27,8 @@ def _paths(datapath: str):
 
 
 def cmd_reset(args):
+    from open_table_format.iceber_ops import reset_demo_state
+
     wh = os.getenv("WAREHOUSE", "file:///app/warehouse")
     dp = os.getenv("DATAPATH", "s3://iceberg/data")
     p = _paths(dp)
@@ -40,6 +37,8 @@ def cmd_reset(args):
 
 
 def cmd_make_data(args):
+    from open_table_format.iceber_ops import gen_parquet_ns
+
     dp = os.getenv("DATAPATH", "s3://iceberg/data")
     p = _paths(dp)
     out = gen_parquet_ns(p["LOCAL_NS"])
@@ -47,6 +46,8 @@ def cmd_make_data(args):
 
 
 def cmd_edit_data(args):
+    from open_table_format.iceber_ops import edit_local_ns_file
+
     dp = os.getenv("DATAPATH", "s3://iceberg/data")
     p = _paths(dp)
     out = edit_local_ns_file(p["LOCAL_NS"], add_rows=args.rows)
@@ -54,6 +55,8 @@ def cmd_edit_data(args):
 
 
 def cmd_upload_step2(args):
+    from open_table_format.iceber_ops import s3_object_exists, upload_local_to_s3
+
     dp = os.getenv("DATAPATH", "s3://iceberg/data")
     p = _paths(dp)
     upload_local_to_s3(p["LOCAL_NS"], p["S2_S3_NS"])
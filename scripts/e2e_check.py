@@ -1,25 +1,28 @@
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-import pandas as pd
-import pyarrow as pa
-import pyarrow.parquet as pq
 
-from open_table_format.iceber_ops import (
-    reset_demo_state,
-    gen_parquet_ns,
-    rewrite_ns_to_us,
-    upload_local_to_s3,
-    append_from_parquet,
-    add_files_register,
-    inspect_table,
-    write_manual_rows,
-    s3_object_exists,
-)
+def main() -> None:
+    # Heavy imports (pandas/pyarrow/pyiceberg) are deferred until the check actually runs
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
 
+    from open_table_format.iceber_ops import (
+        reset_demo_state,
+        gen_parquet_ns,
+        rewrite_ns_to_us,
+        upload_local_to_s3,
+        append_from_parquet,
+        add_files_register,
+        inspect_table,
+        write_manual_rows,
+        s3_object_exists,
+        write_parquet_streaming,
+    )
 
-def main() -> None:
     wh = os.getenv("WAREHOUSE", "file:///app/warehouse")
     dp = os.getenv("DATAPATH", "s3://iceberg/data")
     print("ENV WAREHOUSE=", wh)
@@ -57,18 +60,23 @@ def main() -> None:
         }
     )
     arr_ns = pa.Table.from_pandas(rows, preserve_index=False)
-    opts_us = pa.compute.CastOptions(
-        target_type=pa.timestamp("us", tz="UTC"), allow_time_truncate=True
-    )
-    ts_idx = arr_ns.schema.get_field_index("timestamp")
-    arr_us = arr_ns.set_column(
-        ts_idx, "timestamp", pa.compute.cast(arr_ns["timestamp"], options=opts_us)
-    )
+    # One schema-wide cast (safe=False permits ns -> us truncation) instead of per-column set_column
+    us_schema = pa.schema([
+        pa.field(f.name, pa.timestamp("us", tz="UTC")) if f.name == "timestamp" else f
+        for f in arr_ns.schema
+    ])
+    arr_us = arr_ns.cast(us_schema, safe=False)
     Path("data").mkdir(parents=True, exist_ok=True)
     custom_ns = Path("data/custom_ns.parquet")
     custom_us = Path("data/custom_us.parquet")
-    pq.write_table(arr_ns, custom_ns)
-    pq.write_table(arr_us, custom_us)
+    # The two files are independent; write them concurrently
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [
+            pool.submit(write_parquet_streaming, arr_ns, custom_ns),
+            pool.submit(write_parquet_streaming, arr_us, custom_us),
+        ]
+        for f in futures:
+            f.result()
     print("STEP1 saved:", custom_ns, custom_us)
 
     # Also create ts_ns source via helper and rewrite to us
@@ -77,38 +85,36 @@ def main() -> None:
     rewrite_ns_to_us(step1_ns, rewrite_out)
     print("STEP1 rewrite_out (ts_ns->us):", rewrite_out)
 
-    # Step 2: Upload to S3 (ns source)
+    # Step 2 + Step 3 sources: the same ns file goes to two keys, so overlap both
+    # uploads on the shared (thread-safe) boto3 client
     s2_uri = f"{dp}/step2_events_ns.parquet"
-    upload_local_to_s3(step1_ns, s2_uri)
+    s3_uri = f"{dp}/e2e_step3_append_ns.parquet"
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(upload_local_to_s3, step1_ns, uri) for uri in (s2_uri, s3_uri)]
+        for f in futures:
+            f.result()
     print("STEP2 uploaded exists:", s3_object_exists(s2_uri))
 
     # Step 3: Append from S3 (ns source; writer path handles cast)
-    s3_uri = f"{dp}/e2e_step3_append_ns.parquet"
-    upload_local_to_s3(step1_ns, s3_uri)
     append_snap = append_from_parquet(wh, s3_uri)
     print("STEP3 append snapshot:", append_snap)
 
     # Step 3: add_files with local path — must match Iceberg schema exactly
     # Prepare a local file with id:int32 (not null), ts:timestamp[us] (naive) and correct names
     reg_local = Path("data/step4_register_ns.parquet")
-    t = pq.read_table(rewrite_out)
-    # rename ts_ns -> ts
-    names = ["id", "ts"] if "ts_ns" in t.schema.names else t.schema.names
-    t = t.rename_columns(names)
-    id_idx = t.schema.get_field_index("id")
-    ts_idx = t.schema.get_field_index("ts")
-    cast_id = pa.compute.cast(t["id"], target_type=pa.int32())
-    cast_ts = pa.compute.cast(
-        t["ts"], options=pa.compute.CastOptions(target_type=pa.timestamp("us"), allow_time_truncate=True)
-    )
-    t = t.set_column(id_idx, "id", cast_id)
-    t = t.set_column(ts_idx, "ts", cast_ts)
     target_schema = pa.schema([
         pa.field("id", pa.int32(), nullable=False),
         pa.field("ts", pa.timestamp("us"), nullable=True),
     ])
-    t = t.cast(target_schema)
-    pq.write_table(t, reg_local)
+    # rewrite_ns_to_us always emits (id, ts_ns): rename ts_ns -> ts and cast every column in one pass.
+    # Parquet is columnar: `columns=` lets the reader resolve column chunks from the footer and
+    # skip fetching/decoding everything else, so keep this list in sync if the source gains columns.
+    t = (
+        pq.read_table(rewrite_out, columns=["id", "ts_ns"], use_threads=True, pre_buffer=True)
+        .rename_columns(["id", "ts"])
+        .cast(target_schema, safe=False)
+    )
+    write_parquet_streaming(t, reg_local)
     reg_snap = add_files_register(wh, str(reg_local))
     print("STEP3 add_files snapshot:", reg_snap)
 
@@ -1,5 +1,4 @@
 import os
-import shutil
 import time
 import json
 import ast
@@ -7,7 +6,6 @@ from pathlib import Path
 import streamlit as st
 import pandas as pd
 import pyarrow as pa
-import pyarrow.parquet as pq
 
 from open_table_format.iceber_ops import (
     DEFAULT_WAREHOUSE,
@@ -21,29 +19,102 @@ from open_table_format.iceber_ops import (
     s3_object_exists,
     reset_demo_state,
     write_manual_rows,
+    write_parquet_streaming,
+    copy_local_file,
 )
 
 
 st.set_page_config(page_title="Open Table Format • PyIceberg Demo", layout="wide")
 
 
+_LOG_KEYS = (
+    "logs_gen",
+    "logs_upload",
+    "logs_rewrite",
+    "logs_append",
+    "logs_add_files",
+    "logs_inspect",
+)
+
+
+# Minimal CSS-based dark theme, injected when the sidebar toggle is on
+_DARK_CSS = """
+<style>
+  .stApp { background-color: #0f172a; color: #e2e8f0; }
+  .stMarkdown, .stCode, .stText, .stCaption, .stSubheader, .stHeader, .stDataFrame, .stJson { color: #e2e8f0 !important; }
+  pre, code { background: #0b1220 !important; color: #e2e8f0 !important; }
+  .stButton>button { background: #1e293b; color: #e2e8f0; border: 1px solid #334155; }
+  .stButton>button:hover { background: #0b1220; }
+</style>
+"""
+
+
 def _init_state():
-    for k in [
-        "logs_gen",
-        "logs_upload",
-        "logs_rewrite",
-        "logs_append",
-        "logs_add_files",
-        "logs_inspect",
-    ]:
-        st.session_state.setdefault(k, [])
-    st.session_state.setdefault("dark_mode", False)
+    # Runs on every rerun; a single flag check replaces per-key setdefault calls after the first
+    if st.session_state.get("_inited"):
+        return
+    for k in _LOG_KEYS:
+        st.session_state[k] = []
+    st.session_state["dark_mode"] = False
+    st.session_state["_inited"] = True
 
 
 def _log(key: str, msg: str) -> None:
     st.session_state[key].append(msg)
 
 
+def _maybe_upload(src: Path, dst: str) -> bool:
+    """Upload ``src`` to ``dst`` unless this session already uploaded the same file version.
+
+    The fingerprint is (source path, mtime_ns, size) of the local file. Returns True if an
+    upload ran.
+    """
+    stat = src.stat()
+    fp = (str(src), stat.st_mtime_ns, stat.st_size)
+    uploaded = st.session_state.setdefault("upload_fingerprints", {})
+    if uploaded.get(dst) == fp:
+        return False
+    upload_local_to_s3(src, dst)
+    uploaded[dst] = fp
+    return True
+
+
+def _inspect_cached(warehouse: str, last_snapshot: int | None) -> dict:
+    """Memoize inspect_table in this session, keyed on the warehouse and its last commit.
+
+    Kept in session_state rather than st.cache_data: the key is session-local, so a
+    process-wide entry would be served to sessions that never saw the newer commits.
+    """
+    key = (warehouse, last_snapshot)
+    cached = st.session_state.get("inspect_cache")
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    info = inspect_table(warehouse)
+    st.session_state["inspect_cache"] = (key, info)
+    return info
+
+
+# orjson is an optional speedup for Step 5; resolved once so a missing install costs nothing per click
+try:
+    from orjson import loads as _fast_loads
+except ImportError:
+    _fast_loads = None
+
+
+def _parse_rows(text: str):
+    """Parse Step 5 rows: orjson when installed, then stdlib json, then Python literals."""
+    if _fast_loads is not None:
+        try:
+            return _fast_loads(text)
+        except ValueError:  # orjson.JSONDecodeError
+            pass
+    # stdlib json still accepts NaN/Infinity; literal_eval handles Python dict literals
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return ast.literal_eval(text)
+
+
 def _flow_dot(datapath: str) -> str:
     return f"""
     digraph G {{
@@ -65,8 +136,15 @@ def _flow_dot(datapath: str) -> str:
     """
 
 
+@st.cache_data(show_spinner=False)
+def _flow_dot_cached(datapath: str) -> str:
+    return _flow_dot(datapath)
+
+
 def run():
     _init_state()
+    # Bind the session proxy once; attribute access on it is a Python-level lookup per call
+    ss = st.session_state
     WAREHOUSE = os.getenv("WAREHOUSE", DEFAULT_WAREHOUSE)
     DATAPATH = os.getenv("DATAPATH", DEFAULT_DATAPATH)
     # Unique, visible names per step
@@ -92,33 +170,15 @@ def run():
         ]), language="bash")
         st.divider()
         st.subheader("Appearance")
-        st.session_state.dark_mode = st.toggle("Dark mode", value=st.session_state.dark_mode, help="Apply a dark theme for the current session")
+        ss.dark_mode = st.toggle("Dark mode", value=ss.dark_mode, help="Apply a dark theme for the current session")
         if st.button("Clear logs", help="Reset all step logs to empty"):
-            for key in [
-                "logs_gen",
-                "logs_upload",
-                "logs_rewrite",
-                "logs_append",
-                "logs_add_files",
-                "logs_inspect",
-            ]:
-                st.session_state[key] = []
+            for key in _LOG_KEYS:
+                ss[key] = []
             st.success("Cleared logs.")
 
     # Apply minimal CSS-based dark theme if toggled
-    if st.session_state.dark_mode:
-        st.markdown(
-            """
-            <style>
-              .stApp { background-color: #0f172a; color: #e2e8f0; }
-              .stMarkdown, .stCode, .stText, .stCaption, .stSubheader, .stHeader, .stDataFrame, .stJson { color: #e2e8f0 !important; }
-              pre, code { background: #0b1220 !important; color: #e2e8f0 !important; }
-              .stButton>button { background: #1e293b; color: #e2e8f0; border: 1px solid #334155; }
-              .stButton>button:hover { background: #0b1220; }
-            </style>
-            """,
-            unsafe_allow_html=True,
-        )
+    if ss.dark_mode:
+        st.markdown(_DARK_CSS, unsafe_allow_html=True)
 
     st.title("🧊 Open Table Format: ns → us write paths")
     st.write(
@@ -127,7 +187,7 @@ def run():
 
     # Flow diagram
     st.subheader("📈 Flow Overview")
-    dot = _flow_dot(DATAPATH)
+    dot = _flow_dot_cached(DATAPATH)
     try:
         st.graphviz_chart(dot, use_container_width=True)
     except Exception:
@@ -141,8 +201,8 @@ def run():
     st.caption("Create or edit rows (id + timestamp), preview ns/us schemas, and save to your chosen path.")
 
     # Initialize editable data
-    if "df_edit" not in st.session_state:
-        st.session_state.df_edit = pd.DataFrame({
+    if "df_edit" not in ss:
+        ss.df_edit = pd.DataFrame({
             "id": [1, 2, 3],
             "timestamp": pd.to_datetime([
                 "2024-01-01 12:34:56.123456789Z",
@@ -150,90 +210,84 @@ def run():
                 "2024-01-01 12:34:56.123456791Z",
             ], utc=True),
         })
-    if "step1_output" not in st.session_state:
-        st.session_state.step1_output = str(LOCAL_NS)
+    if "step1_output" not in ss:
+        ss.step1_output = str(LOCAL_NS)
 
     # Editable grid
     st.subheader("Step 1A — Editable Data Grid")
     st.caption("Edit values freely; keep 'id' and 'timestamp' columns present.")
-    st.session_state.df_edit = st.data_editor(
-        st.session_state.df_edit,
+    df_edit = ss.df_edit = st.data_editor(
+        ss.df_edit,
         num_rows="dynamic",
         use_container_width=True,
         key="grid_step1",
     )
 
-    # Helper to build Arrow table with target unit
-    def _arrow_from_df(df: pd.DataFrame, unit: str) -> pa.Table:
-        df2 = df.copy()
-        # Ensure types
-        df2["id"] = pd.to_numeric(df2["id"], errors="coerce").astype("Int64").fillna(0).astype(int)
-        df2["timestamp"] = pd.to_datetime(df2["timestamp"], utc=True, errors="coerce")
-        t = pa.Table.from_pandas(df2[["id", "timestamp"]], preserve_index=False)
-        # Cast timestamp to requested unit with UTC tz
-        opts = pa.compute.CastOptions(target_type=pa.timestamp(unit, tz="UTC"), allow_time_truncate=(unit=="us"))
-        ts_idx = t.schema.get_field_index("timestamp")
-        t2 = t.set_column(ts_idx, "timestamp", pa.compute.cast(t["timestamp"], options=opts))
-        return t2
-
     # Timestamp column selection + per-column units
-    if "ts_cols" not in st.session_state:
-        st.session_state.ts_cols = [c for c in st.session_state.df_edit.columns if c.lower() in ("timestamp", "ts")] or ["timestamp"]
-    if "ts_units" not in st.session_state:
-        st.session_state.ts_units = {c: "ns" for c in st.session_state.ts_cols}
+    if "ts_cols" not in ss:
+        ss.ts_cols = [c for c in df_edit.columns if c.lower() in ("timestamp", "ts")] or ["timestamp"]
+    if "ts_units" not in ss:
+        ss.ts_units = {c: "ns" for c in ss.ts_cols}
 
     st.subheader("Select timestamp columns & units")
-    cols = list(st.session_state.df_edit.columns)
-    st.session_state.ts_cols = st.multiselect(
+    cols = list(df_edit.columns)
+    ts_cols = ss.ts_cols = st.multiselect(
         "Timestamp columns",
         options=cols,
-        default=[c for c in st.session_state.ts_cols if c in cols],
+        default=[c for c in ss.ts_cols if c in cols],
         help="Choose one or more timestamp columns to cast when saving",
     )
     # Ensure units dict only for chosen columns
-    st.session_state.ts_units = {c: st.session_state.ts_units.get(c, "ns") for c in st.session_state.ts_cols}
+    prev_units = ss.ts_units
+    units = ss.ts_units = {c: prev_units.get(c, "ns") for c in ts_cols}
 
     # Per-column unit pickers
-    if st.session_state.ts_cols:
-        cc = st.columns(min(4, len(st.session_state.ts_cols)))
-        for i, col in enumerate(st.session_state.ts_cols):
+    if ts_cols:
+        cc = st.columns(min(4, len(ts_cols)))
+        for i, col in enumerate(ts_cols):
             with cc[i % len(cc)]:
-                st.session_state.ts_units[col] = st.selectbox(
-                    f"Unit for {col}", ["ns", "us"], index=0 if st.session_state.ts_units.get(col, "ns") == "ns" else 1
+                units[col] = st.selectbox(
+                    f"Unit for {col}", ["ns", "us"], index=0 if units.get(col, "ns") == "ns" else 1
                 )
 
     # Build Arrow table applying selected per-column units
     def _arrow_from_df_multi(df: pd.DataFrame, units_map: dict[str, str]) -> pa.Table:
-        df2 = df.copy()
-        if "id" in df2:
-            df2["id"] = pd.to_numeric(df2["id"], errors="coerce").astype("Int64").fillna(0).astype(int)
-        # Normalize timestamp-like columns
-        for c in units_map:
-            if c in df2:
-                df2[c] = pd.to_datetime(df2[c], utc=True, errors="coerce")
-        t = pa.Table.from_pandas(df2, preserve_index=False)
-        for c, unit in units_map.items():
-            if c in t.schema.names:
-                idx = t.schema.get_field_index(c)
-                opts = pa.compute.CastOptions(target_type=pa.timestamp(unit, tz="UTC"), allow_time_truncate=(unit == "us"))
-                t = t.set_column(idx, c, pa.compute.cast(t[c], options=opts))
-        return t
-
-    out_path = st.text_input("Output Parquet path", value=st.session_state.step1_output, key="step1_out_path")
+        # Build Arrow arrays column by column; no DataFrame copy or from_pandas pass.
+        arrays, fields = [], []
+        for c in df.columns:
+            if c == "id":
+                ids = pd.to_numeric(df[c], errors="coerce").fillna(0).to_numpy(dtype="int64")
+                arr = pa.array(ids, type=pa.int64())
+            elif c in units_map:
+                unit = units_map[c]
+                ts = pd.to_datetime(df[c], utc=True, errors="coerce")
+                # UTC datetime64 values converted straight to the target unit (ns -> us truncates)
+                values = ts.to_numpy(dtype="datetime64[ns]").astype(f"datetime64[{unit}]")
+                arr = pa.array(values, type=pa.timestamp(unit, tz="UTC"), from_pandas=True)
+            else:
+                arr = pa.Array.from_pandas(df[c])
+            arrays.append(arr)
+            fields.append(pa.field(str(c), arr.type))
+        return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+    out_path = st.text_input("Output Parquet path", value=ss.step1_output, key="step1_out_path")
     c_pa, c_pb = st.columns(2)
     with c_pa:
         if st.button("Preview schema (selected units)", use_container_width=True):
-            t_sel = _arrow_from_df_multi(st.session_state.df_edit, st.session_state.ts_units)
-            st.session_state["schema_preview_selected"] = str(t_sel.schema)
-        if st.session_state.get("schema_preview_selected"):
-            st.code(st.session_state["schema_preview_selected"], language="text")
+            t_sel = _arrow_from_df_multi(df_edit, units)
+            ss["schema_preview_selected"] = str(t_sel.schema)
+        schema_preview = ss.get("schema_preview_selected")
+        if schema_preview:
+            st.code(schema_preview, language="text")
     with c_pb:
         if st.button("Save with selected units", use_container_width=True):
-            t_sel = _arrow_from_df_multi(st.session_state.df_edit, st.session_state.ts_units)
-            pq.write_table(t_sel, out_path)
-            st.session_state.step1_output = out_path
+            t_sel = _arrow_from_df_multi(df_edit, units)
+            write_parquet_streaming(t_sel, out_path)
+            ss.step1_output = out_path
             st.success(f"Saved: {out_path}")
             st.code(str(t_sel.schema), language="text")
+    # Latest Step 1 output, read once for the steps below
+    step1_out = Path(ss.step1_output)
 
     st.divider()
     st.subheader("Step 1B — Quick Generate/Rewrite")
@@ -247,33 +301,33 @@ def run():
                 _log("logs_gen", f"Generated: {p}")
             st.success("Generated sample Parquet.")
         with st.expander("Logs / Output", expanded=False):
-            st.code("\n".join(st.session_state["logs_gen"]))
+            st.code("\n".join(ss["logs_gen"]))
     with c2:
         rw_path = st.text_input("Rewrite ns→us →", value=str(LOCAL_US), key="rw_us_path")
         if st.button("Rewrite ns → us (local)", use_container_width=True):
             with st.spinner("Rewriting ns → us locally (allows truncation)..."):
-                src = Path(st.session_state.get("step1_output", str(LOCAL_NS)))
-                out = rewrite_ns_to_us(src, Path(rw_path))
+                out = rewrite_ns_to_us(step1_out, Path(rw_path))
                 _log("logs_rewrite", f"Rewritten file: {out}")
             st.success(f"Rewritten to microseconds: {rw_path}")
         with st.expander("Logs / Output", expanded=False):
-            st.code("\n".join(st.session_state["logs_rewrite"]))
+            st.code("\n".join(ss["logs_rewrite"]))
 
     st.divider()
 
     # Section: Upload
     st.header("☁️ Step 2 — Upload to MinIO (S3 API)")
     st.caption("Choose a local source path and S3 destination URI; then upload.")
-    up_src = st.text_input("Local source path", value=st.session_state.get("step1_output", str(LOCAL_NS)), key="upload_src")
+    up_src = st.text_input("Local source path", value=str(step1_out), key="upload_src")
     up_dst = st.text_input("S3 destination URI", value=S2_S3_NS, key="upload_dst")
     if st.button("Step 2 — Upload", use_container_width=True):
         with st.spinner("Uploading to MinIO via boto3..."):
-            upload_local_to_s3(Path(up_src), up_dst)
-            exists = s3_object_exists(up_dst)
-            _log("logs_upload", f"Uploaded: {up_dst}; exists={exists}")
+            uploaded = _maybe_upload(Path(up_src), up_dst)
+            # upload_file raises on failure, so only a skipped upload needs a HEAD probe
+            exists = True if uploaded else s3_object_exists(up_dst)
+            _log("logs_upload", f"{'Uploaded' if uploaded else 'Unchanged, skipped upload'}: {up_dst}; exists={exists}")
         st.success(f"Uploaded to {up_dst}")
     with st.expander("Logs / Output", expanded=False):
-        st.code("\n".join(st.session_state["logs_upload"]))
+        st.code("\n".join(ss["logs_upload"]))
 
     st.divider()
 
@@ -302,20 +356,21 @@ def run():
                 try:
                     if src_choice.startswith("S3"):
                         # Ensure the S3 object exists by uploading the latest Step1 output
-                        upload_local_to_s3(Path(st.session_state.get("step1_output", str(LOCAL_NS))), append_src_uri)
+                        _maybe_upload(step1_out, append_src_uri)
                         uri = append_src_uri
                     else:
                         # Ensure local us file exists by rewriting from latest Step1 output
-                        rewrite_ns_to_us(Path(st.session_state.get("step1_output", str(LOCAL_NS))), Path(append_src_uri))
+                        rewrite_ns_to_us(step1_out, Path(append_src_uri))
                         uri = append_src_uri
                     sid = append_from_parquet(WAREHOUSE, uri)
+                    ss.last_snapshot = sid
                     _log("logs_append", f"Append source={uri} snapshot={sid}")
                     st.success(f"Append committed. snapshot={sid}")
                 except Exception as e:
                     _log("logs_append", f"Append failed: {e}")
                     st.error(f"Append failed: {e}")
         with st.expander("Logs / Output", expanded=False):
-            st.code("\n".join(st.session_state["logs_append"]))
+            st.code("\n".join(ss["logs_append"]))
 
     with c4:
         st.subheader("Register via add_files (no downcast)")
@@ -327,17 +382,17 @@ def run():
                 try:
                     # If local path: ensure a file exists by copying the latest Step1 output
                     if not reg_path.startswith("s3://"):
-                        src_local = Path(st.session_state.get("step1_output", str(LOCAL_NS)))
                         Path(reg_path).parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copyfile(src_local, reg_path)
+                        copy_local_file(step1_out, reg_path)
                     sid = add_files_register(WAREHOUSE, reg_path)
+                    ss.last_snapshot = sid
                     _log("logs_add_files", f"add_files snapshot: {sid}")
                     st.success(f"add_files committed. snapshot={sid}")
                 except Exception as e:
                     _log("logs_add_files", f"add_files failed: {e}")
                     st.error(f"add_files failed: {e}")
         with st.expander("Logs / Output", expanded=False):
-            st.code("\n".join(st.session_state["logs_add_files"]))
+            st.code("\n".join(ss["logs_add_files"]))
 
     st.divider()
 
@@ -346,11 +401,11 @@ def run():
     st.caption("Show current snapshot IDs, locations, and schemas.")
     if st.button("Step 4 — Inspect Iceberg table metadata", use_container_width=True):
         with st.spinner("Loading table metadata..."):
-            info = inspect_table(WAREHOUSE)
+            info = _inspect_cached(WAREHOUSE, ss.get("last_snapshot"))
             _log("logs_inspect", "Fetched metadata.")
         st.json(info)
     with st.expander("Logs / Output", expanded=False):
-        st.code("\n".join(st.session_state["logs_inspect"]))
+        st.code("\n".join(ss["logs_inspect"]))
 
     st.divider()
     st.header("🚀 Quick Test — Run All Steps")
@@ -364,22 +419,24 @@ def run():
             out = rewrite_ns_to_us(LOCAL_NS, LOCAL_US)
             _log("logs_rewrite", f"Rewritten: {out}")
             summary["rewritten"] = str(out)
-            upload_local_to_s3(LOCAL_NS, S2_S3_NS)
-            _log("logs_upload", f"Uploaded: {S2_S3_NS}")
+            uploaded = _maybe_upload(LOCAL_NS, S2_S3_NS)
+            _log("logs_upload", f"{'Uploaded' if uploaded else 'Unchanged, skipped upload'}: {S2_S3_NS}")
             summary["uploaded"] = S2_S3_NS
             # Ensure a unique S3 object for append
-            upload_local_to_s3(LOCAL_NS, S3_S3_NS)
+            _maybe_upload(LOCAL_NS, S3_S3_NS)
             sid_append = append_from_parquet(WAREHOUSE, S3_S3_NS)
+            ss.last_snapshot = sid_append
             _log("logs_append", f"Snapshot append: {sid_append}")
             summary["snapshot_append"] = sid_append
             # Ensure a unique local file for add_files registration
             L4_LOCAL_NS.parent.mkdir(parents=True, exist_ok=True)
             unique_local = Path(str(L4_LOCAL_NS).replace('.parquet', f"_{int(time.time())}.parquet"))
-            shutil.copyfile(LOCAL_NS, unique_local)
+            copy_local_file(LOCAL_NS, unique_local)
             sid_add = add_files_register(WAREHOUSE, str(unique_local))
+            ss.last_snapshot = sid_add
             _log("logs_add_files", f"Snapshot add_files: {sid_add}")
             summary["snapshot_add_files"] = sid_add
-            info = inspect_table(WAREHOUSE)
+            info = _inspect_cached(WAREHOUSE, ss.get("last_snapshot"))
             _log("logs_inspect", "Fetched metadata after run-all")
             summary["inspect"] = info
             st.success("End-to-end flow completed.")
@@ -398,6 +455,10 @@ def run():
             s3_targets = [S2_S3_NS, S3_S3_NS]
             with st.spinner("Resetting demo state..."):
                 res = reset_demo_state(WAREHOUSE, local_targets, s3_targets)
+            # Deleted objects must be re-uploaded on the next click
+            ss.pop("upload_fingerprints", None)
+            ss.pop("last_snapshot", None)
+            ss.pop("inspect_cache", None)
             st.success("Reset complete.")
             st.json(res)
     with cU2:
@@ -428,10 +489,7 @@ def run():
         st.caption("The table will be dropped and recreated with the edited schema.")
         if st.button("Step 5 — Write rows (recreate table)", use_container_width=True):
             try:
-                try:
-                    rows = json.loads(json_text)
-                except json.JSONDecodeError:
-                    rows = ast.literal_eval(json_text)
+                rows = _parse_rows(json_text)
                 assert isinstance(rows, list) and all(isinstance(r, dict) for r in rows)
             except Exception as e:
                 st.error(f"Invalid JSON rows: {e}")
@@ -449,10 +507,18 @@ def run():
     st.caption("Preview rows from the target table and its schema.")
     view_table = st.text_input("Table to view", value="db.manual", key="view_table_name")
     view_limit = st.number_input("Row limit", min_value=1, max_value=5000, value=100, step=50, key="view_limit")
+    # Column options come from the last preview of this table; empty selection reads all columns
+    view_cols = st.multiselect(
+        "Columns (empty = all)",
+        options=ss.get(f"view_columns_{view_table}", []),
+        key=f"view_cols_{view_table}",
+        help="Only the selected Parquet columns are read from storage",
+    )
     if st.button("Preview target table", use_container_width=True):
         try:
             from open_table_format.iceber_ops import preview_table_rows
-            preview = preview_table_rows(WAREHOUSE, view_table, int(view_limit))
+            preview = preview_table_rows(WAREHOUSE, view_table, int(view_limit), columns=view_cols or None)
+            ss[f"view_columns_{view_table}"] = preview.get("columns", [])
             st.code(preview.get("schema", ""), language="text")
             if "error" in preview:
                 st.error(f"Preview failed: {preview['error']}")
@@ -1,5 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
+import contextlib
+import functools
 import os
+import shutil
 
 import pandas as pd
 import pyarrow as pa
@@ -16,44 +21,102 @@ from pyiceberg.types import (
     BooleanType,
     TimestampType,
 )
+from pyiceberg.table import Table
 from pyiceberg.table.sorting import UNSORTED_SORT_ORDER
 from pyiceberg.manifest import DataFile
-from pyiceberg.exceptions import NoSuchNamespaceError
+from pyiceberg.exceptions import NamespaceAlreadyExistsError, NoSuchNamespaceError, NoSuchTableError
 from urllib.parse import urlparse
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 
 DEFAULT_WAREHOUSE = os.getenv("WAREHOUSE", "s3://iceberg/warehouse")
 DEFAULT_DATAPATH  = os.getenv("DATAPATH",  "s3://iceberg/data")
 TABLE_NAME = "db.events"
 
+# CPUs this process may actually run on (container/taskset limits), not the host's count.
+_CPUS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 4)
+# Column decode/cast run on Arrow's CPU pool; size it to the usable CPUs so a pinned
+# container does not oversubscribe.
+pa.set_cpu_count(_CPUS)
+# S3 reads/writes run on Arrow's IO pool (default 8 threads). IO waits on the network,
+# not the CPU, so never go below the default; grow it on larger hosts so pre-buffered
+# range reads and background multipart writes can overlap.
+pa.set_io_thread_count(max(8, min(16, _CPUS * 2)))
+
+@functools.lru_cache(maxsize=4)
+def _load_catalog(catalog_uri: str, warehouse_uri: str):
+    # Cached per process: CLI calls and Streamlit reruns share one catalog (and its engine).
+    return load_catalog("dev", uri=catalog_uri, warehouse=warehouse_uri)
+
 def _catalog(warehouse_uri: str):
     # Use a SQL-backed catalog (SQLite) for metadata, and S3 for the warehouse location.
     # This works with pyiceberg>=0.10 where file catalogs are not inferred from s3:// URIs.
     catalog_uri = os.getenv("CATALOG_URI", "sqlite:///catalog.db")
-    return load_catalog("dev", uri=catalog_uri, warehouse=warehouse_uri)
+    return _load_catalog(catalog_uri, warehouse_uri)
 
-def ensure_table(warehouse_uri: str = DEFAULT_WAREHOUSE, table_name: str = TABLE_NAME):
+def _ensure_namespace(cat, table_name: str):
+    # Check first: probing with create_namespace builds an exception on every call
+    if "." in table_name:
+        ns = tuple(table_name.split(".")[:-1])
+        if not cat.namespace_exists(ns):
+            try:
+                cat.create_namespace(ns)
+            except NamespaceAlreadyExistsError:
+                pass  # created concurrently
+
+def ensure_table(warehouse_uri: str = DEFAULT_WAREHOUSE, table_name: str = TABLE_NAME) -> Table:
     cat = _catalog(warehouse_uri)
     schema = Schema(
         NestedField(1, "id", IntegerType(), required=True),
         NestedField(2, "ts", TimestampType(), required=False),
     )
+    # One load on the happy path: SqlCatalog.table_exists() is itself a load_table() call
     try:
         return cat.load_table(table_name)
-    except Exception:
-        # Ensure namespace exists
-        if "." in table_name:
-            ns = tuple(table_name.split(".")[:-1])
-            try:
-                cat.create_namespace(ns)
-            except Exception:
-                pass
-        return cat.create_table(
-            identifier=table_name,
-            schema=schema,
-            sort_order=UNSORTED_SORT_ORDER,
-            properties={"format-version": "2"},
-        )
+    except NoSuchTableError:
+        pass
+    _ensure_namespace(cat, table_name)
+    return cat.create_table(
+        identifier=table_name,
+        schema=schema,
+        sort_order=UNSORTED_SORT_ORDER,
+        properties={"format-version": "2"},
+    )
+
+# Rows per record batch / row group for streamed reads and writes (~L2-sized for 2-4 int64 cols)
+BATCH_ROWS = 8192
+_WRITE_OPTS = dict(
+    compression="zstd",
+    compression_level=3,
+    data_page_size=256 * 1024,
+    data_page_version="2.0",
+    write_statistics=True,
+)
+
+def _parquet_write_options(schema: pa.Schema) -> Dict[str, Any]:
+    """ParquetWriter kwargs for the demo's small files.
+
+    Integer/timestamp columns (ids, monotonic times) use DELTA_BINARY_PACKED and floats use
+    BYTE_STREAM_SPLIT; Arrow rejects explicit encodings on dictionary-encoded columns, so
+    dictionary encoding is enabled only for the remaining columns.
+    """
+    encoding: Dict[str, str] = {}
+    for f in schema:
+        if pa.types.is_integer(f.type) or pa.types.is_timestamp(f.type):
+            encoding[f.name] = "DELTA_BINARY_PACKED"
+        elif pa.types.is_floating(f.type):
+            encoding[f.name] = "BYTE_STREAM_SPLIT"
+    dictionary = [f.name for f in schema if f.name not in encoding]
+    return {**_WRITE_OPTS, "use_dictionary": dictionary, "column_encoding": encoding}
+
+def write_parquet_streaming(table: pa.Table, path: Path | str, batch_rows: int = BATCH_ROWS) -> Path:
+    """Write ``table`` through a ParquetWriter in row groups of ``batch_rows`` rows.
+
+    Row groups are sliced across the table's chunks, so a concatenated table (e.g. after
+    an edit) is not split into one small row group per chunk.
+    """
+    with pq.ParquetWriter(str(path), table.schema, **_parquet_write_options(table.schema)) as writer:
+        writer.write_table(table, row_group_size=batch_rows)
+    return Path(path)
 
 def gen_parquet_ns(out_path: Path = Path("data/events_ns.parquet")) -> Path:
     out_path.parent.mkdir(parents=True, exist_ok=True)
@@ -66,45 +129,130 @@ def gen_parquet_ns(out_path: Path = Path("data/events_ns.parquet")) -> Path:
         ], utc=True)
     })
     t = pa.Table.from_pandas(df, preserve_index=False)
-    pq.write_table(t, out_path)
+    write_parquet_streaming(t, out_path)
     return out_path
 
 def rewrite_ns_to_us(src: Path, dst: Path) -> Path:
-    t = pq.read_table(src)
-    if "ts_ns" not in t.schema.names:
-        raise ValueError("expected column 'ts_ns'")
-    # Allow truncation from ns -> us and preserve timezone
-    opts = pa.compute.CastOptions(
-        target_type=pa.timestamp("us", tz="UTC"),
-        allow_time_truncate=True,
+    with pq.ParquetFile(src) as pf:
+        schema = pf.schema_arrow
+        if "ts_ns" not in schema.names:
+            raise ValueError("expected column 'ts_ns'")
+        ts_idx = schema.get_field_index("ts_ns")
+        if schema.field(ts_idx).type == pa.timestamp("us", tz="UTC"):
+            # Already microseconds: copy the bytes instead of decoding, casting and re-encoding
+            if Path(src).resolve() != Path(dst).resolve():
+                shutil.copyfile(src, dst)
+            return dst
+        # Allow truncation from ns -> us and preserve timezone
+        opts = pa.compute.CastOptions(
+            target_type=pa.timestamp("us", tz="UTC"),
+            allow_time_truncate=True,
+        )
+        out_schema = schema.set(ts_idx, pa.field("ts_ns", pa.timestamp("us", tz="UTC")))
+        # Stream batches through the writer (one row group each); write to a sibling temp
+        # file so rewriting a file onto itself never truncates the source mid-read.
+        tmp = Path(dst).with_name(Path(dst).name + ".tmp")
+        try:
+            with pq.ParquetWriter(str(tmp), out_schema, **_parquet_write_options(out_schema)) as writer:
+                for batch in pf.iter_batches(batch_size=BATCH_ROWS, use_threads=True):
+                    writer.write_batch(
+                        batch.set_column(ts_idx, "ts_ns", pa.compute.cast(batch["ts_ns"], options=opts))
+                    )
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+    os.replace(tmp, dst)
+    return dst
+
+def copy_local_file(src: Path | str, dst: Path | str) -> Path:
+    """Copy a file in-kernel via copy_file_range (O(1) reflink on btrfs/XFS).
+
+    Falls back to a buffered copy where the syscall is unavailable, raises, or returns 0
+    before EOF (some filesystems report "unsupported" that way instead of an error).
+    """
+    if not hasattr(os, "copy_file_range"):
+        shutil.copyfile(src, dst)
+        return Path(dst)
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        remaining = os.fstat(s.fileno()).st_size
+        try:
+            while remaining > 0:
+                n = os.copy_file_range(s.fileno(), d.fileno(), remaining)
+                if n == 0:
+                    break
+                remaining -= n
+        except OSError:
+            pass  # e.g. cross-filesystem on older kernels
+        if remaining > 0:
+            # Restart from scratch so a partial in-kernel copy never leaves a short file
+            s.seek(0)
+            d.seek(0)
+            d.truncate()
+            shutil.copyfileobj(s, d, 1024 * 1024)
+    return Path(dst)
+
+@functools.lru_cache(maxsize=4)
+def _s3_client(endpoint: str | None, region: str | None):
+    """Return a boto3 S3 client shared per (endpoint, region).
+
+    Client construction walks botocore's loaders and endpoint resolver, so reuse
+    one client (and its connection pool) across uploads and HEAD probes.
+    """
+    import boto3
+    from botocore.config import Config
+    # A private session keeps creation safe when first called from worker threads.
+    return boto3.session.Session().client(
+        "s3",
+        endpoint_url=endpoint,
+        region_name=region,
+        config=Config(
+            max_pool_connections=50,
+            # Fail fast instead of hanging the UI on botocore's 60s defaults.
+            connect_timeout=10,
+            read_timeout=10,
+            retries={"mode": "standard", "max_attempts": 3},
+        ),
     )
-    t2 = t.set_column(
-        t.schema.get_field_index("ts_ns"),
-        "ts_ns",
-        pa.compute.cast(t["ts_ns"], options=opts),
+
+def _env_s3_client():
+    """The shared S3 client for the endpoint/region configured in the environment."""
+    return _s3_client(os.getenv("AWS_ENDPOINT_URL"), os.getenv("AWS_REGION"))
+
+@functools.lru_cache(maxsize=1)
+def _transfer_config():
+    """Multipart settings for upload_file: 8 MiB parts streamed from disk on 8 threads."""
+    from boto3.s3.transfer import TransferConfig
+    return TransferConfig(
+        multipart_threshold=8 * 1024 * 1024,
+        multipart_chunksize=8 * 1024 * 1024,
+        max_concurrency=8,
+        use_threads=True,
     )
-    pq.write_table(t2, dst)
-    return dst
 
 def upload_local_to_s3(local: Path, s3_uri: str):
-    import boto3
     p = urlparse(s3_uri)
     if p.scheme != "s3":
         raise ValueError("dst must be s3://...")
     bucket, key = p.netloc, p.path.lstrip("/")
-    s3 = boto3.client("s3", endpoint_url=os.getenv("AWS_ENDPOINT_URL"), region_name=os.getenv("AWS_REGION"))
-    s3.upload_file(str(local), bucket, key)
+    s3 = _env_s3_client()
+    s3.upload_file(str(local), bucket, key, Config=_transfer_config())
     return s3_uri
 
 def _s3_filesystem():
-    """Create a configured S3 filesystem for PyArrow that points to MinIO.
+    """Return a configured S3 filesystem for PyArrow that points to MinIO.
 
     Uses common env vars: AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_ENDPOINT_URL, AWS_REGION.
+    The filesystem is cached per env tuple so repeated reads reuse its connections.
     """
-    endpoint = os.getenv("AWS_ENDPOINT_URL")
-    access_key = os.getenv("AWS_ACCESS_KEY_ID")
-    secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
-    region = os.getenv("AWS_REGION", "us-east-1")
+    return _cached_s3_filesystem(
+        os.getenv("AWS_ENDPOINT_URL"),
+        os.getenv("AWS_ACCESS_KEY_ID"),
+        os.getenv("AWS_SECRET_ACCESS_KEY"),
+        os.getenv("AWS_REGION", "us-east-1"),
+    )
+
+@functools.lru_cache(maxsize=4)
+def _cached_s3_filesystem(endpoint: str | None, access_key: str | None, secret_key: str | None, region: str):
     scheme = "http" if endpoint and endpoint.startswith("http://") else "https"
     return pa.fs.S3FileSystem(
         access_key=access_key,
@@ -112,45 +260,80 @@ def _s3_filesystem():
         endpoint_override=endpoint,
         region=region,
         scheme=scheme,
+        background_writes=True,
+        connect_timeout=5,
+        request_timeout=30,
     )
 
 def _is_s3_uri(uri: str) -> bool:
     return urlparse(uri).scheme == "s3"
 
+S3_READ_BUFFER_SIZE = 8 * 1024 * 1024
+
+@contextlib.contextmanager
+def _open_parquet(uri: str) -> Iterator[pq.ParquetFile]:
+    """Open a local or s3:// Parquet file for reading.
+
+    S3 objects are read with pre_buffer so column-chunk ranges are coalesced into a few
+    large GETs, plus an 8 MiB read buffer, instead of many small range requests.
+    """
+    if not _is_s3_uri(uri):
+        with pq.ParquetFile(uri) as pf:
+            yield pf
+        return
+    p = urlparse(uri)
+    with _s3_filesystem().open_input_file(f"{p.netloc}/{p.path.lstrip('/')}") as f:
+        yield pq.ParquetFile(f, pre_buffer=True, buffer_size=S3_READ_BUFFER_SIZE)
+
+# Append path target: id as Iceberg int (32-bit, required), ts as microseconds without tz.
+# Built once at import; append_from_parquet runs on every UI click / CLI call.
+_APPEND_TARGET_SCHEMA = pa.schema([
+    pa.field("id", pa.int32(), nullable=False),
+    pa.field("ts", pa.timestamp("us"), nullable=True),
+])
+_ID_CAST_OPTS = pa.compute.CastOptions(target_type=pa.int32())
+_TS_CAST_OPTS = pa.compute.CastOptions(target_type=pa.timestamp("us"), allow_time_truncate=True)
+
+# Accepted names for the source time column: generated files, Step 1 grid, rewritten registers
+_APPEND_TS_COLUMNS = ("ts_ns", "timestamp", "ts")
+
+def _append_batches(pf: pq.ParquetFile) -> Iterator[pa.RecordBatch]:
+    # Only the (id, timestamp) pair is appended. Project it in the reader so other
+    # column chunks are never fetched (fewer S3 range bytes) or decoded.
+    names = pf.schema_arrow.names
+    ts_col = next((c for c in _APPEND_TS_COLUMNS if c in names), None)
+    if "id" not in names or ts_col is None:
+        raise ValueError(f"expected column 'id' and one of {_APPEND_TS_COLUMNS}, got {names}")
+    columns = ["id", ts_col]
+    for batch in pf.iter_batches(batch_size=BATCH_ROWS, columns=columns, use_threads=True):
+        # Cast each column once (id: int64 -> int32, ts: ns tz -> us naive) and build the
+        # batch straight onto the target schema; naming comes from the schema, so no
+        # rename/set_column intermediates
+        yield pa.RecordBatch.from_arrays(
+            [
+                pa.compute.cast(batch.column("id"), options=_ID_CAST_OPTS),
+                pa.compute.cast(batch.column(ts_col), options=_TS_CAST_OPTS),
+            ],
+            schema=_APPEND_TARGET_SCHEMA,
+        )
+
 def append_from_parquet(warehouse: str, parquet_uri: str):
     os.environ["PYICEBERG_DOWNCAST_NS_TIMESTAMP_TO_US_ON_WRITE"] = "True"
+    # Decode and cast one batch at a time: only the cast result is held in full, never
+    # an uncast copy of the whole file alongside it. (pyiceberg 0.10's append needs a Table.)
+    with _open_parquet(parquet_uri) as pf:
+        table = pa.Table.from_batches(_append_batches(pf), schema=_APPEND_TARGET_SCHEMA)
     tbl = ensure_table(warehouse)
-    if _is_s3_uri(parquet_uri):
-        fs = _s3_filesystem()
-        p = urlparse(parquet_uri)
-        s3_path = f"{p.netloc}/{p.path.lstrip('/')}"
-        table = pq.read_table(s3_path, filesystem=fs)
-    else:
-        table = pq.read_table(parquet_uri)
-    table = table.rename_columns(["id", "ts"])  # id: int64 -> int32, ts: ns tz-> us (naive)
-    # Cast id to Iceberg int (32-bit) and timestamps to microseconds without tz
-    id_idx = table.schema.get_field_index("id")
-    ts_idx = table.schema.get_field_index("ts")
-    id_opts = pa.compute.CastOptions(target_type=pa.int32())
-    ts_opts = pa.compute.CastOptions(target_type=pa.timestamp("us"), allow_time_truncate=True)
-    table = table.set_column(id_idx, "id", pa.compute.cast(table["id"], options=id_opts))
-    table = table.set_column(ts_idx, "ts", pa.compute.cast(table["ts"], options=ts_opts))
-    # Enforce non-nullability for 'id' to match Iceberg required field
-    target_schema = pa.schema([
-        pa.field("id", pa.int32(), nullable=False),
-        pa.field("ts", pa.timestamp("us"), nullable=True),
-    ])
-    table = table.cast(target_schema)
     tbl.append(table)
     return tbl.current_snapshot().snapshot_id
 
 def add_files_register(warehouse: str, parquet_uri: str):
-    tbl = ensure_table(warehouse)
     # Normalize path: use file:// for local paths to avoid S3 resolution
     if _is_s3_uri(parquet_uri):
         path = parquet_uri
     else:
         path = Path(parquet_uri).resolve().as_uri()
+    tbl = ensure_table(warehouse)
     try:
         tbl.add_files([path])
     except Exception as e:
@@ -162,31 +345,74 @@ def add_files_register(warehouse: str, parquet_uri: str):
     return tbl.current_snapshot().snapshot_id
 
 def s3_object_exists(s3_uri: str) -> bool:
-    import boto3
     p = urlparse(s3_uri)
     if p.scheme != "s3":
         return False
     bucket, key = p.netloc, p.path.lstrip("/")
-    s3 = boto3.client("s3", endpoint_url=os.getenv("AWS_ENDPOINT_URL"), region_name=os.getenv("AWS_REGION"))
+    s3 = _env_s3_client()
     try:
         s3.head_object(Bucket=bucket, Key=key)
         return True
     except Exception:
         return False
 
+# Error codes S3/MinIO use for a key that is not there
+_S3_MISSING_CODES = frozenset({"NoSuchKey", "404", "NotFound"})
+
 def s3_delete_object(s3_uri: str) -> bool:
-    import boto3
     p = urlparse(s3_uri)
     if p.scheme != "s3":
         return False
     bucket, key = p.netloc, p.path.lstrip("/")
-    s3 = boto3.client("s3", endpoint_url=os.getenv("AWS_ENDPOINT_URL"), region_name=os.getenv("AWS_REGION"))
+    from botocore.exceptions import ClientError
+    s3 = _env_s3_client()
     try:
         s3.delete_object(Bucket=bucket, Key=key)
         return True
+    except ClientError as e:
+        # Delete is idempotent: a missing key is already in the desired state
+        return e.response.get("Error", {}).get("Code") in _S3_MISSING_CODES
     except Exception:
         return False
 
+def s3_delete_objects(s3_uris: list[str]) -> list[str]:
+    """Delete many S3 objects with one DeleteObjects call per bucket (max 1000 keys each).
+
+    Calls for different buckets/chunks run concurrently.
+    Deletes are idempotent, so no HEAD probes are issued. Returns the URIs reported deleted
+    (keys the server reports as missing count as deleted).
+    """
+    by_bucket: dict[str, list[str]] = {}
+    for uri in s3_uris:
+        p = urlparse(uri)
+        if p.scheme == "s3":
+            by_bucket.setdefault(p.netloc, []).append(p.path.lstrip("/"))
+    if not by_bucket:
+        return []
+    s3 = _env_s3_client()
+
+    def _delete(bucket: str, keys: list[str]) -> list[str]:
+        try:
+            resp = s3.delete_objects(
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": k} for k in keys], "Quiet": False},
+            )
+        except Exception:
+            return []
+        gone = [d["Key"] for d in resp.get("Deleted", [])]
+        gone += [e["Key"] for e in resp.get("Errors", []) if e.get("Code") in _S3_MISSING_CODES]
+        return [f"s3://{bucket}/{k}" for k in gone]
+
+    jobs = [
+        (bucket, keys[i:i + 1000])
+        for bucket, keys in by_bucket.items()
+        for i in range(0, len(keys), 1000)
+    ]
+    # Requests for different buckets/chunks are independent: overlap their round-trips
+    with ThreadPoolExecutor(max_workers=min(8, len(jobs))) as pool:
+        results = pool.map(lambda job: _delete(*job), jobs)
+        return [uri for chunk in results for uri in chunk]
+
 def drop_table_if_exists(warehouse_uri: str = DEFAULT_WAREHOUSE, table_name: str = TABLE_NAME) -> bool:
     try:
         cat = _catalog(warehouse_uri)
@@ -208,61 +434,67 @@ def reset_demo_state(warehouse_uri: str, local_paths: list[Path], s3_uris: list[
                 summary["deleted_local"].append(str(lp))
         except Exception:
             pass
-    for su in s3_uris:
-        if s3_delete_object(su):
-            summary["deleted_s3"].append(su)
+    summary["deleted_s3"] = s3_delete_objects(s3_uris)
     return summary
 
 def edit_local_ns_file(path: Path, add_rows: int = 1) -> Path:
     """Append a few rows to the local ns parquet file to simulate edits."""
-    import pandas as pd
     if not path.exists():
         gen_parquet_ns(path)
-    t = pq.read_table(path)
-    df = t.to_pandas()
-    last_id = int(df["id"].max()) if not df.empty else 0
-    base_ts = df["ts_ns"].max() if "ts_ns" in df.columns and not df.empty else pd.Timestamp("2024-01-01 00:00:00Z")
-    new_ids = list(range(last_id + 1, last_id + 1 + add_rows))
-    new_ts = [pd.to_datetime(base_ts) + pd.to_timedelta(i, unit="ns") for i in range(1, add_rows + 1)]
-    df2 = pd.DataFrame({"id": new_ids, "ts_ns": pd.to_datetime(new_ts, utc=True)})
-    out = pd.concat([df, df2], ignore_index=True)
-    pq.write_table(pa.Table.from_pandas(out, preserve_index=False), path)
+    t = pq.read_table(path, use_threads=True, pre_buffer=True)
+    # Stay in Arrow: max() over the columns, a small appendix table, then concat
+    id_type = t.schema.field("id").type
+    ts_type = t.schema.field("ts_ns").type if "ts_ns" in t.schema.names else pa.timestamp("ns", tz="UTC")
+    last_id = pa.compute.max(t["id"]).as_py() or 0
+    max_ts = pa.compute.max(t["ts_ns"]) if "ts_ns" in t.schema.names else None
+    if max_ts is not None and max_ts.is_valid:
+        base_ts = max_ts.value
+    else:
+        base_ts = pa.scalar(datetime(2024, 1, 1, tzinfo=timezone.utc), type=ts_type).value
+    appendix = pa.table({
+        "id": pa.array(range(last_id + 1, last_id + 1 + add_rows), type=id_type),
+        # one tick of the column's unit (ns for generated files) per new row, taken as raw
+        # int64 ticks of ts_type (no per-row datetime objects)
+        "ts_ns": pa.array(range(base_ts + 1, base_ts + 1 + add_rows), type=ts_type),
+    })
+    out = pa.concat_tables([t, appendix], promote_options="default")
+    write_parquet_streaming(out, path)
     return path
 
 # ========= Manual rows (UI helper) =========
-def _pa_type_to_iceberg(dt: pa.DataType):
-    if pa.types.is_int8(dt) or pa.types.is_int16(dt) or pa.types.is_int32(dt):
-        return IntegerType()
-    if pa.types.is_int64(dt):
-        return LongType()
-    if pa.types.is_float32(dt):
-        return FloatType()
-    if pa.types.is_float64(dt):
-        return DoubleType()
-    if pa.types.is_string(dt):
-        return StringType()
-    if pa.types.is_boolean(dt):
-        return BooleanType()
-    if pa.types.is_timestamp(dt):
-        return TimestampType()
-    raise ValueError(f"Unsupported Arrow type for dynamic schema: {dt}")
+# Arrow type id -> Iceberg type, so the per-field lookup is one dict hit instead of a
+# chain of pa.types predicates. Every timestamp unit/tz shares one Arrow type id.
+_ARROW_TO_ICEBERG = {
+    pa.int8().id: IntegerType,
+    pa.int16().id: IntegerType,
+    pa.int32().id: IntegerType,
+    pa.int64().id: LongType,
+    pa.float32().id: FloatType,
+    pa.float64().id: DoubleType,
+    pa.string().id: StringType,
+    pa.bool_().id: BooleanType,
+    pa.timestamp("us").id: TimestampType,
+}
 
-def _ensure_namespace(cat, table_name: str):
-    if "." in table_name:
-        ns = tuple(table_name.split(".")[:-1])
-        try:
-            cat.create_namespace(ns)
-        except Exception:
-            pass
+def _pa_type_to_iceberg(dt: pa.DataType):
+    iceberg_type = _ARROW_TO_ICEBERG.get(dt.id)
+    if iceberg_type is None:
+        raise ValueError(f"Unsupported Arrow type for dynamic schema: {dt}")
+    return iceberg_type()
 
-def write_manual_rows(warehouse_uri: str, table_name: str, rows: list[dict]) -> int:
+def write_manual_rows(
+    warehouse_uri: str, table_name: str, rows: list[dict], arrow_schema: pa.Schema | None = None
+) -> int:
     """Recreate the table with a schema derived from rows and append them.
 
+    Pass ``arrow_schema`` when the column types are known to skip Arrow's type inference.
     Returns the new snapshot id.
     """
     cat = _catalog(warehouse_uri)
     _ensure_namespace(cat, table_name)
-    t = pa.Table.from_pylist(rows)
+    # Transpose to columns once; keys follow the schema, else the first row (as from_pylist infers them)
+    keys = arrow_schema.names if arrow_schema is not None else (list(rows[0]) if rows else [])
+    t = pa.table({k: [r.get(k) for r in rows] for k in keys}, schema=arrow_schema)
     # Build Iceberg schema
     nested = []
     fid = 1
@@ -286,40 +518,42 @@ def write_manual_rows(warehouse_uri: str, table_name: str, rows: list[dict]) ->
     tbl.append(t)
     return tbl.current_snapshot().snapshot_id
 
-def preview_table_rows(warehouse_uri: str, table_name: str, limit: int = 100) -> Dict[str, Any]:
+def preview_table_rows(
+    warehouse_uri: str, table_name: str, limit: int = 100, columns: List[str] | None = None
+) -> Dict[str, Any]:
     """Return a small preview of table rows and schema for display in UI.
 
-    Tries pandas first; falls back to Arrow batches if needed.
+    ``columns`` projects the scan so only those column chunks are read; None reads all.
+    Batches are pulled only until ``limit`` rows are collected, so cost scales with the
+    limit rather than the table size.
     """
     cat = _catalog(warehouse_uri)
     tbl = cat.load_table(table_name)
-    result: Dict[str, Any] = {"schema": str(tbl.schema()), "rows": [], "count": 0}
+    result: Dict[str, Any] = {
+        "schema": str(tbl.schema()),
+        "columns": [f.name for f in tbl.schema().fields],
+        "rows": [],
+        "count": 0,
+    }
     try:
-        scan = tbl.scan(limit=limit)
-        try:
-            # Preferred: convert directly to pandas
-            df = scan.to_pandas()
-            result["rows"] = df.head(limit).to_dict(orient="records")
-            result["count"] = len(df)
-            return result
-        except Exception:
-            pass
-        try:
-            # Fallback: Arrow batches
-            batches = list(scan.to_arrow())
-            if batches:
-                import pyarrow as pa
-                tb = pa.Table.from_batches(batches)
-                import pandas as pd
-                df = tb.to_pandas()
-                result["rows"] = df.head(limit).to_dict(orient="records")
-                result["count"] = len(df)
-        except Exception:
-            # Ignore and let outer handler capture any errors
-            pass
+        scan = tbl.scan(limit=limit, selected_fields=tuple(columns) if columns else ("*",))
+        batches: List[pa.RecordBatch] = []
+        taken = 0
+        with scan.to_arrow_batch_reader() as reader:
+            for batch in reader:
+                batch = batch.slice(0, limit - taken)
+                batches.append(batch)
+                taken += batch.num_rows
+                if taken >= limit:
+                    break
+            tb = pa.Table.from_batches(batches, schema=reader.schema)
+        # Rows straight from Arrow buffers; no DataFrame needed for a small preview
+        result["rows"] = tb.to_pylist()
+        result["count"] = tb.num_rows
     except Exception as e:
         result["error"] = str(e)
     return result
+
 def inspect_table(warehouse: str):
     tbl = ensure_table(warehouse)
     md = tbl.metadata
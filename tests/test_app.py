@@ -0,0 +1,53 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from open_table_format import app
+
+
+@pytest.fixture
+def uploads(monkeypatch):
+    calls = []
+    monkeypatch.setattr(app, "st", SimpleNamespace(session_state={}))
+    monkeypatch.setattr(app, "upload_local_to_s3", lambda src, dst: calls.append((src, dst)))
+    return calls
+
+
+def test_maybe_upload_skips_unchanged_file(tmp_path, uploads):
+    src = tmp_path / "ns.parquet"
+    src.write_bytes(b"v1")
+    assert app._maybe_upload(src, "s3://b/k") is True
+    assert app._maybe_upload(src, "s3://b/k") is False
+    assert app._maybe_upload(src, "s3://b/other") is True
+    assert len(uploads) == 2
+
+
+def test_maybe_upload_reuploads_changed_file(tmp_path, uploads):
+    src = tmp_path / "ns.parquet"
+    src.write_bytes(b"v1")
+    app._maybe_upload(src, "s3://b/k")
+    src.write_bytes(b"v22")
+    assert app._maybe_upload(src, "s3://b/k") is True
+    assert len(uploads) == 2
+
+
+def test_maybe_upload_reuploads_other_source_with_same_stat(tmp_path, uploads):
+    a, b = tmp_path / "a.parquet", tmp_path / "b.parquet"
+    a.write_bytes(b"v1")
+    b.write_bytes(b"v2")
+    os.utime(b, ns=(a.stat().st_atime_ns, a.stat().st_mtime_ns))
+    app._maybe_upload(a, "s3://b/k")
+    assert app._maybe_upload(b, "s3://b/k") is True
+    assert [src for src, _ in uploads] == [a, b]
+
+def test_parse_rows_accepts_json_and_python_literals():
+    assert app._parse_rows('[{"id": 1, "name": "a"}]') == [{"id": 1, "name": "a"}]
+    assert app._parse_rows("[{'id': 1, 'ok': True}]") == [{"id": 1, "ok": True}]
+    rows = app._parse_rows('[{"x": NaN}]')
+    assert rows[0]["x"] != rows[0]["x"]
+
+
+def test_parse_rows_without_orjson(monkeypatch):
+    monkeypatch.setattr(app, "_fast_loads", None)
+    assert app._parse_rows("[{'id': 2}]") == [{"id": 2}]
@@ -0,0 +1,200 @@
+import threading
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from open_table_format import iceber_ops
+
+
+def _column_encodings(path, name):
+    md = pq.ParquetFile(path).metadata
+    idx = md.schema.names.index(name)
+    return set(md.row_group(0).column(idx).encodings)
+
+
+def _row_group_rows(path):
+    md = pq.ParquetFile(path).metadata
+    return [md.row_group(i).num_rows for i in range(md.num_row_groups)]
+
+
+def test_write_parquet_streaming_row_groups(tmp_path):
+    t = pa.table({"id": pa.array(range(10), pa.int64()), "category": pa.array(["a", "b"] * 5)})
+    out = iceber_ops.write_parquet_streaming(t, tmp_path / "t.parquet", batch_rows=4)
+    assert _row_group_rows(out) == [4, 4, 2]
+    assert pq.read_table(out).equals(t)
+
+
+def test_write_parquet_streaming_merges_chunks(tmp_path):
+    t = pa.concat_tables([pa.table({"id": [1, 2, 3]}), pa.table({"id": [4]}), pa.table({"id": [5]})])
+    out = iceber_ops.write_parquet_streaming(t, tmp_path / "t.parquet")
+    assert _row_group_rows(out) == [5]
+
+def test_write_parquet_streaming_encodings(tmp_path):
+    t = pa.table({
+        "id": pa.array(range(10), pa.int64()),
+        "amount": pa.array([float(i) for i in range(10)]),
+        "category": pa.array(["a", "b"] * 5),
+    })
+    out = iceber_ops.write_parquet_streaming(t, tmp_path / "t.parquet")
+    assert "DELTA_BINARY_PACKED" in _column_encodings(out, "id")
+    assert "BYTE_STREAM_SPLIT" in _column_encodings(out, "amount")
+    assert "RLE_DICTIONARY" in _column_encodings(out, "category")
+    assert pq.read_table(out).equals(t)
+
+
+def test_rewrite_ns_to_us_onto_itself(tmp_path):
+    path = iceber_ops.gen_parquet_ns(tmp_path / "ns.parquet")
+    iceber_ops.rewrite_ns_to_us(path, path)
+    t = pq.read_table(path)
+    assert t.schema.field("ts_ns").type == pa.timestamp("us", tz="UTC")
+    assert t["id"].to_pylist() == [1, 2, 3]
+    assert not (tmp_path / "ns.parquet.tmp").exists()
+
+
+def test_rewrite_ns_to_us_copies_microsecond_source(tmp_path):
+    src = iceber_ops.rewrite_ns_to_us(
+        iceber_ops.gen_parquet_ns(tmp_path / "ns.parquet"), tmp_path / "us.parquet"
+    )
+    dst = iceber_ops.rewrite_ns_to_us(src, tmp_path / "copy.parquet")
+    assert dst.read_bytes() == src.read_bytes()
+    # Rewriting a microsecond file onto itself leaves it untouched
+    assert iceber_ops.rewrite_ns_to_us(src, src).read_bytes() == dst.read_bytes()
+
+def test_rewrite_ns_to_us_removes_temp_file_on_failure(tmp_path):
+    path = tmp_path / "bad.parquet"
+    pq.write_table(pa.table({"ts_ns": ["not a timestamp"]}), path)
+    with pytest.raises(pa.ArrowInvalid):
+        iceber_ops.rewrite_ns_to_us(path, tmp_path / "out.parquet")
+    assert list(tmp_path.iterdir()) == [path]
+
+@pytest.mark.parametrize("mode", ["kernel", "zero", "error", "missing"])
+def test_copy_local_file(tmp_path, monkeypatch, mode):
+    src = tmp_path / "src.bin"
+    src.write_bytes(bytes(range(256)) * 4096)
+    if mode == "zero":
+        # Some filesystems return 0 instead of raising when the syscall is unsupported
+        monkeypatch.setattr(iceber_ops.os, "copy_file_range", lambda *a: 0, raising=False)
+    elif mode == "error":
+        def _fail(*a):
+            raise OSError("EXDEV")
+        monkeypatch.setattr(iceber_ops.os, "copy_file_range", _fail, raising=False)
+    elif mode == "missing":
+        monkeypatch.delattr(iceber_ops.os, "copy_file_range", raising=False)
+    dst = iceber_ops.copy_local_file(src, tmp_path / "dst.bin")
+    assert dst.read_bytes() == src.read_bytes()
+
+def test_rewrite_ns_to_us_requires_ts_ns(tmp_path):
+    path = tmp_path / "bad.parquet"
+    pq.write_table(pa.table({"id": [1]}), path)
+    with pytest.raises(ValueError):
+        iceber_ops.rewrite_ns_to_us(path, tmp_path / "out.parquet")
+
+
+@pytest.fixture
+def warehouse(tmp_path, monkeypatch):
+    monkeypatch.setenv("CATALOG_URI", f"sqlite:///{tmp_path / 'catalog.db'}")
+    return (tmp_path / "wh").as_uri()
+
+
+def test_ensure_table_sees_external_drop_and_recreate(warehouse, tmp_path):
+    from pyiceberg.catalog import load_catalog
+
+    first = iceber_ops.ensure_table(warehouse)
+    # Another process (dev_tasks reset, e2e_check) drops and recreates the table
+    other = load_catalog("dev", uri=f"sqlite:///{tmp_path / 'catalog.db'}", warehouse=warehouse)
+    other.drop_table(iceber_ops.TABLE_NAME)
+    recreated = other.create_table(iceber_ops.TABLE_NAME, schema=first.schema())
+
+    again = iceber_ops.ensure_table(warehouse)
+    assert again.metadata.table_uuid == recreated.metadata.table_uuid
+    assert again.metadata.table_uuid != first.metadata.table_uuid
+    assert iceber_ops.inspect_table(warehouse)["snapshots"] == []
+
+    other.drop_table(iceber_ops.TABLE_NAME)
+    assert iceber_ops.ensure_table(warehouse).metadata.table_uuid != recreated.metadata.table_uuid
+
+def test_preview_table_rows_limit_and_projection(warehouse):
+    rows = [{"id": i, "category": f"c{i}", "amount": i * 1.5} for i in range(5)]
+    iceber_ops.write_manual_rows(warehouse, "db.manual", rows)
+
+    full = iceber_ops.preview_table_rows(warehouse, "db.manual", limit=3)
+    assert "error" not in full
+    assert full["count"] == 3
+    assert full["columns"] == ["id", "category", "amount"]
+
+    projected = iceber_ops.preview_table_rows(warehouse, "db.manual", limit=10, columns=["id"])
+    assert projected["count"] == 5
+    assert all(set(r) == {"id"} for r in projected["rows"])
+
+
+class _StubS3:
+    """Records delete_objects calls; keys starting with 'missing' come back as NoSuchKey."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def delete_objects(self, Bucket, Delete):
+        keys = [o["Key"] for o in Delete["Objects"]]
+        with self._lock:
+            self.calls.append((Bucket, len(keys)))
+        return {
+            "Deleted": [{"Key": k} for k in keys if not k.startswith("missing")],
+            "Errors": [{"Key": k, "Code": "NoSuchKey"} for k in keys if k.startswith("missing")],
+        }
+
+
+def test_s3_delete_objects_groups_by_bucket(monkeypatch):
+    stub = _StubS3()
+    monkeypatch.setattr(iceber_ops, "_env_s3_client", lambda: stub)
+    uris = [f"s3://a/k{i}" for i in range(1001)] + ["s3://b/missing", "/local/file"]
+    deleted = iceber_ops.s3_delete_objects(uris)
+    assert sorted(stub.calls) == [("a", 1), ("a", 1000), ("b", 1)]
+    assert sorted(deleted) == sorted(uris[:-1])
+
+
+def test_s3_delete_objects_without_s3_uris(monkeypatch):
+    monkeypatch.setattr(iceber_ops, "_env_s3_client", lambda: pytest.fail("no client expected"))
+    assert iceber_ops.s3_delete_objects(["/local/file"]) == []
+
+
+def test_edit_local_ns_file_appends_ids_and_ticks(tmp_path):
+    path = iceber_ops.gen_parquet_ns(tmp_path / "ns.parquet")
+    before = pq.read_table(path)
+    iceber_ops.edit_local_ns_file(path, add_rows=2)
+    iceber_ops.edit_local_ns_file(path, add_rows=2)
+    after = pq.read_table(path)
+    assert after.schema == before.schema
+    assert after["id"].to_pylist() == [1, 2, 3, 4, 5, 6, 7]
+    ticks = after["ts_ns"].cast(pa.int64()).to_pylist()
+    assert [b - a for a, b in zip(ticks, ticks[1:])] == [1] * 6
+    assert _row_group_rows(path) == [7]
+
+
+def test_write_manual_rows_uses_arrow_schema(warehouse):
+    schema = pa.schema([("id", pa.int32()), ("category", pa.string())])
+    iceber_ops.write_manual_rows(warehouse, "db.manual", [{"id": 1, "category": "a"}], arrow_schema=schema)
+    preview = iceber_ops.preview_table_rows(warehouse, "db.manual")
+    assert "1: id: optional int" in preview["schema"]
+    assert preview["rows"] == [{"id": 1, "category": "a"}]
+
+
+def test_append_from_parquet_selects_columns_by_name(warehouse, tmp_path):
+    path = tmp_path / "grid.parquet"
+    pq.write_table(pa.table({
+        "timestamp": pa.array([1_000], pa.timestamp("ns", tz="UTC")),
+        "note": ["a"],
+        "id": pa.array([7], pa.int64()),
+    }), path)
+    iceber_ops.append_from_parquet(warehouse, str(path))
+    rows = iceber_ops.ensure_table(warehouse).scan().to_arrow()
+    assert rows["id"].to_pylist() == [7]
+    assert rows["ts"].cast(pa.int64()).to_pylist() == [1]
+
+
+def test_append_from_parquet_rejects_unknown_columns(warehouse, tmp_path):
+    path = tmp_path / "xy.parquet"
+    pq.write_table(pa.table({"x": [1], "y": [2]}), path)
+    with pytest.raises(ValueError):
+        iceber_ops.append_from_parquet(warehouse, str(path))